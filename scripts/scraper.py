@@ -1,14 +1,24 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-import os, requests, smtplib, traceback, json, feedparser
+import os, io, traceback, json, feedparser
+import orjson
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from datetime import datetime, timedelta
 import re
+import asyncio
+import aiohttp
+import aiosmtplib
+import hashlib
+from collections import OrderedDict
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +30,12 @@ logger = logging.getLogger("digest-api")
 # Load environment variables
 load_dotenv()
 
+# Configuration, resolved once at import
+NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
+ORIGIN_EMAIL = os.getenv("ORIGIN_EMAIL")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+
 # Create FastAPI app
 app = FastAPI()
 
@@ -32,6 +48,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Patterns used for title deduplication and the fallback summarizer
+_WORD_RE = re.compile(r'\w+')
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Titles sharing at least this fraction of significant words count as duplicates
+DUPLICATE_TITLE_SIMILARITY = 0.7
+
+# Limits for outbound page fetches
+FETCH_CONCURRENCY = 10
+FETCH_TIMEOUT = aiohttp.ClientTimeout(total=10)
+FETCH_RETRIES = 2
+FETCH_BACKOFF = 0.3
+fetch_semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+# List of popular news RSS feeds
+RSS_FEEDS = [
+    "http://rss.cnn.com/rss/cnn_topstories.rss",
+    "https://moxie.foxnews.com/feedburner/latest.xml",
+    "http://feeds.bbci.co.uk/news/world/rss.xml",
+    "https://www.npr.org/rss/rss.php?id=1001",
+    "http://rss.nytimes.com/services/xml/rss/nyt/HomePage.xml"
+]
+
+# Recent source results keyed by (source, query, num_articles)
+NEWS_CACHE_TTL = 300
+news_cache = TTLCache(maxsize=512, ttl=NEWS_CACHE_TTL)
+
+# Parsed RSS feeds keyed by URL, stored with the ETag and Last-Modified validators
+feed_cache = {}
+
+# Hugging Face summarization model
+HF_API_URL = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
+HF_HEADERS = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
+SUMMARY_PARAMETERS = {"max_length": 150, "min_length": 50, "do_sample": False}
+MAX_SUMMARY_INPUT = 1024
+
+# Texts under this many words come back from the model nearly unchanged
+MIN_SUMMARY_WORDS = 120
+
+# Article content kept for summarizing, a little over what the model reads
+CONTENT_CHAR_BUDGET = 2048
+
+# Summaries keyed by a hash of the text sent to the model, least recently used evicted first
+SUMMARY_CACHE_SIZE = 2048
+summary_cache = OrderedDict()
+
+# Keep concurrent Hugging Face calls low to stay within rate limits
+SUMMARIZE_CONCURRENCY = 5
+
+@app.on_event("startup")
+async def check_email_config():
+    # Fail at startup rather than on the first digest request
+    if not ORIGIN_EMAIL:
+        logger.error("ORIGIN_EMAIL environment variable is not set")
+        raise ValueError("Email sender address not configured in environment variables")
+
+    if not EMAIL_PASSWORD:
+        logger.error("EMAIL_PASSWORD environment variable is not set")
+        raise ValueError("Email password not configured in environment variables")
+
+# Shared HTTP session so connections are pooled and kept alive across requests
+http_session = None
+
+@app.on_event("startup")
+async def open_http_session():
+    global http_session
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=20),
+        headers={"User-Agent": "Mozilla/5.0"},
+        json_serialize=lambda obj: orjson.dumps(obj).decode()
+    )
+
+# Worker threads for feed parsing handed off with asyncio.to_thread
+PARSE_WORKERS = 16
+
+@app.on_event("startup")
+async def configure_parse_executor():
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=PARSE_WORKERS))
+
+@app.on_event("shutdown")
+async def close_http_session():
+    await http_session.close()
+
 class NewsRequest(BaseModel):
     query: str
     email: str
@@ -44,21 +143,23 @@ async def send_digest(req: NewsRequest):
 
         # Step 1: Get quality news articles
         logger.info(f"Searching for news about: {req.query}")
-        articles = get_quality_news(req.query, req.num_articles)
+        articles = await get_quality_news(http_session, req.query, req.num_articles)
         logger.info(f"Found {len(articles)} articles")
 
         if not articles:
             return {"status": "no articles found", "query": req.query}
 
-        # Step 2: Generate summaries
+        # Step 2: Generate summaries in a single batch
         logger.info("Generating summaries...")
-        for article in articles:
-            if article.get("content") and not article.get("summary"):
-                article["summary"] = summarize(article["content"])
+        pending = [a for a in articles if a.get("content") and not a.get("summary")]
+        if pending:
+            summaries = await summarize_batch(http_session, [a["content"] for a in pending])
+            for article, summary in zip(pending, summaries):
+                article["summary"] = summary
 
         # Step 3: Send email with articles and summaries
         logger.info(f"Sending email to {req.email} with {len(articles)} articles")
-        send_email_digest(req.email, articles)
+        await send_email_digest(req.email, articles)
         logger.info("Email sent successfully")
 
         return {
@@ -72,46 +173,86 @@ async def send_digest(req: NewsRequest):
         logger.error(traceback.format_exc())
         return {"status": "error", "message": str(e)}
 
-def get_quality_news(query, num_articles):
-    """Get high-quality news articles using multiple sources"""
-    articles = []
-
-    # Try NewsAPI first (most reliable if you have an API key)
-    if os.getenv("NEWSAPI_KEY"):
+async def fetch_page(session, url, headers=None):
+    """Fetch a page and return its status, headers and raw body bytes, bounded by the shared fetch semaphore"""
+    for attempt in range(FETCH_RETRIES + 1):
         try:
-            articles = get_news_from_newsapi(query, num_articles)
-            if len(articles) >= num_articles:
-                return articles[:num_articles]
-        except Exception as e:
-            logger.error(f"Error with NewsAPI: {e}")
-
-    # Try RSS feeds next (more reliable than direct scraping)
-    if len(articles) < num_articles:
-        try:
-            rss_articles = get_news_from_rss(query, num_articles - len(articles))
-            articles.extend(rss_articles)
-            if len(articles) >= num_articles:
-                return articles[:num_articles]
-        except Exception as e:
-            logger.error(f"Error with RSS feeds: {e}")
+            async with fetch_semaphore:
+                async with session.get(url, headers=headers, timeout=FETCH_TIMEOUT) as response:
+                    response.raise_for_status()
+                    return response.status, response.headers, await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == FETCH_RETRIES:
+                raise
+            # Back off before retrying a dropped connection or timeout
+            await asyncio.sleep(FETCH_BACKOFF * 2 ** attempt)
+
+def parse_feed(url, headers, body):
+    """Parse raw feed bytes, leaving encoding detection to feedparser"""
+    # feedparser looks up lowercase header names and resolves relative links against content-location
+    response_headers = {key.lower(): value for key, value in headers.items()}
+    response_headers.setdefault("content-location", url)
+    # Wrap the body so feedparser never treats it as a URL or file path
+    return feedparser.parse(io.BytesIO(body), response_headers=response_headers)
+
+async def fetch_feed(session, url):
+    """Fetch a feed and parse it off the event loop"""
+    _, headers, body = await fetch_page(session, url)
+    return await asyncio.to_thread(parse_feed, url, headers, body)
+
+async def fetch_cached_feed(session, url):
+    """Fetch a feed with a conditional request, reusing the parsed copy if it hasn't changed"""
+    etag, last_modified, cached_feed = feed_cache.get(url, (None, None, None))
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    status, response_headers, body = await fetch_page(session, url, headers=headers)
+
+    if status == 304 and cached_feed is not None:
+        logger.debug(f"RSS feed not modified: {url}")
+        return cached_feed
+
+    feed = await asyncio.to_thread(parse_feed, url, response_headers, body)
+
+    etag = response_headers.get("ETag")
+    last_modified = response_headers.get("Last-Modified")
+    if etag or last_modified:
+        feed_cache[url] = (etag, last_modified, feed)
+
+    return feed
+
+async def get_quality_news(session, query, num_articles):
+    """Get high-quality news articles using multiple sources"""
+    # Sources in priority order, so earlier ones win when deduplicating
+    sources = []
+
+    # NewsAPI is the most reliable if you have an API key
+    if NEWSAPI_KEY:
+        sources.append(("NewsAPI", get_news_from_newsapi))
+
+    # RSS feeds and Google News next, with Bing News as the last resort
+    sources += [
+        ("RSS feeds", get_news_from_rss),
+        ("Google News", get_news_from_google),
+        ("Bing News", get_news_from_bing),
+    ]
 
-    # Try Google News for anything remaining (more reliable than Bing)
-    if len(articles) < num_articles:
-        try:
-            google_articles = get_news_from_google(query, num_articles - len(articles))
-            articles.extend(google_articles)
-            if len(articles) >= num_articles:
-                return articles[:num_articles]
-        except Exception as e:
-            logger.error(f"Error with Google News: {e}")
+    # Query every source concurrently
+    results = await asyncio.gather(
+        *[get_news(session, query, num_articles) for _, get_news in sources],
+        return_exceptions=True
+    )
 
-    # Last resort, try Bing News
-    if len(articles) < num_articles:
-        try:
-            bing_articles = get_news_from_bing(query, num_articles - len(articles))
-            articles.extend(bing_articles)
-        except Exception as e:
-            logger.error(f"Error with Bing News: {e}")
+    articles = []
+    for (name, _), result in zip(sources, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error with {name}: {result}")
+            continue
+        articles.extend(result)
 
     # If we still have nothing, generate a fallback article
     if not articles:
@@ -125,45 +266,80 @@ def get_quality_news(query, num_articles):
 
     # Deduplicate articles based on title similarity
     unique_articles = []
-    seen_titles = set()
+    seen_fingerprints = []
 
     for article in articles:
-        # Normalize title to check for duplicates
-        norm_title = normalize_title(article["title"])
+        # Fingerprint title to check for exact and near duplicates
+        fingerprint = title_fingerprint(article["title"])
+
+        if any(title_similarity(fingerprint, seen) >= DUPLICATE_TITLE_SIMILARITY for seen in seen_fingerprints):
+            continue
 
-        if norm_title not in seen_titles:
-            seen_titles.add(norm_title)
-            unique_articles.append(article)
+        seen_fingerprints.append(fingerprint)
+        unique_articles.append(article)
 
     return unique_articles[:num_articles]
 
-def normalize_title(title):
-    """Normalize title for deduplication"""
+def title_fingerprint(title):
+    """Fingerprint title for deduplication"""
     # Convert to lowercase, remove punctuation, and split into words
-    words = re.findall(r'\w+', title.lower())
-    # Keep only significant words (longer than 3 chars)
-    significant = [w for w in words if len(w) > 3]
-    # Sort to make word order irrelevant
-    return " ".join(sorted(significant))
+    words = _WORD_RE.findall(title.lower())
+    # Keep only significant words (longer than 3 chars), ignoring order
+    return frozenset(w for w in words if len(w) > 3)
+
+def title_similarity(a, b):
+    """Jaccard similarity between two title fingerprints"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def cache_news(get_news):
+    """Cache a news source's results for a few minutes per query"""
+    @functools.wraps(get_news)
+    async def wrapper(session, query, num_articles):
+        key = (get_news.__name__, query, num_articles)
+        cached = news_cache.get(key)
+        if cached is not None:
+            logger.info(f"Using cached results for {get_news.__name__}")
+        else:
+            cached = await get_news(session, query, num_articles)
+            # Don't hold on to an empty result from a failed fetch
+            if cached:
+                news_cache[key] = cached
+        # Hand out copies so callers can fill in summaries safely
+        return [dict(article) for article in cached]
+    return wrapper
+
+def clip_content(text):
+    """Trim article content to the character budget, ending on a sentence boundary"""
+    if not text or len(text) <= CONTENT_CHAR_BUDGET:
+        return text
+
+    clipped = text[:CONTENT_CHAR_BUDGET]
+    boundary = max(clipped.rfind(mark) for mark in (". ", "! ", "? "))
+    # Only snap back to a sentence end that keeps most of the budget
+    if boundary >= CONTENT_CHAR_BUDGET // 2:
+        return clipped[:boundary + 1]
+    return clipped
 
-def get_news_from_newsapi(query, num_articles):
+@cache_news
+async def get_news_from_newsapi(session, query, num_articles):
     """Get news from NewsAPI.org (requires API key)"""
-    api_key = os.getenv("NEWSAPI_KEY")
-    if not api_key:
+    if not NEWSAPI_KEY:
         logger.warning("No NewsAPI key found")
         return []
 
     logger.info("Fetching news from NewsAPI.org")
     url = f"https://newsapi.org/v2/everything?q={query}&language=en&sortBy=publishedAt&pageSize={num_articles}"
-    headers = {"X-Api-Key": api_key}
+    headers = {"X-Api-Key": NEWSAPI_KEY}
 
-    response = requests.get(url, headers=headers)
+    async with session.get(url, headers=headers, timeout=FETCH_TIMEOUT) as response:
+        if response.status != 200:
+            logger.error(f"NewsAPI error: {response.status}, {await response.text()}")
+            return []
 
-    if response.status_code != 200:
-        logger.error(f"NewsAPI error: {response.status_code}, {response.text}")
-        return []
+        data = orjson.loads(await response.read())
 
-    data = response.json()
     articles = []
 
     for item in data.get("articles", []):
@@ -172,72 +348,67 @@ def get_news_from_newsapi(query, num_articles):
             "source": item.get("source", {}).get("name", "Unknown"),
             "url": item.get("url", ""),
             "publishedAt": item.get("publishedAt", ""),
-            "content": item.get("content", item.get("description", "")),
+            "content": clip_content(item.get("content", item.get("description", ""))),
             "summary": item.get("description", "")
         })
 
     logger.info(f"Found {len(articles)} articles from NewsAPI")
     return articles
 
-def get_news_from_rss(query, num_articles):
+async def get_news_from_rss(session, query, num_articles):
     """Get news from popular RSS feeds"""
     logger.info("Fetching news from RSS feeds")
 
-    # List of popular news RSS feeds
-    rss_feeds = [
-        "http://rss.cnn.com/rss/cnn_topstories.rss",
-        "https://moxie.foxnews.com/feedburner/latest.xml",
-        "http://feeds.bbci.co.uk/news/world/rss.xml",
-        "https://www.npr.org/rss/rss.php?id=1001",
-        "http://rss.nytimes.com/services/xml/rss/nyt/HomePage.xml"
-    ]
+    query_terms = set(query.lower().split())
+    if not query_terms:
+        return []
+
+    # Match any query term in a single pass over the text
+    query_pattern = re.compile("|".join(re.escape(term) for term in query_terms), re.IGNORECASE)
+
+    # Fetch and parse every feed concurrently
+    feeds = await asyncio.gather(
+        *[fetch_cached_feed(session, feed_url) for feed_url in RSS_FEEDS],
+        return_exceptions=True
+    )
 
     articles = []
-    query_terms = set(query.lower().split())
 
-    for feed_url in rss_feeds:
-        try:
-            logger.debug(f"Parsing RSS feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
-
-            for entry in feed.entries:
-                # Check if article is relevant to the query
-                title = entry.get("title", "").lower()
-                summary = entry.get("summary", "").lower()
-
-                # Check if any query term is in the title or summary
-                is_relevant = any(term in title or term in summary for term in query_terms)
-
-                if is_relevant:
-                    articles.append({
-                        "title": entry.get("title", "Untitled"),
-                        "source": feed.feed.get("title", "RSS Feed"),
-                        "url": entry.get("link", ""),
-                        "publishedAt": entry.get("published", ""),
-                        "content": entry.get("summary", ""),
-                        "summary": entry.get("summary", "")
-                    })
-
-                if len(articles) >= num_articles:
-                    break
+    for feed_url, feed in zip(RSS_FEEDS, feeds):
+        if isinstance(feed, Exception):
+            logger.error(f"Error parsing RSS feed {feed_url}: {feed}")
+            continue
+
+        for entry in feed.entries:
+            # Check if any query term is in the title or summary
+            if query_pattern.search(entry.get("title", "")) or query_pattern.search(entry.get("summary", "")):
+                articles.append({
+                    "title": entry.get("title", "Untitled"),
+                    "source": feed.feed.get("title", "RSS Feed"),
+                    "url": entry.get("link", ""),
+                    "publishedAt": entry.get("published", ""),
+                    "content": clip_content(entry.get("summary", "")),
+                    "summary": Markup(entry.get("summary", ""))
+                })
 
             if len(articles) >= num_articles:
                 break
 
-        except Exception as e:
-            logger.error(f"Error parsing RSS feed {feed_url}: {e}")
+        if len(articles) >= num_articles:
+            break
 
     logger.info(f"Found {len(articles)} articles from RSS feeds")
     return articles
 
-def get_news_from_google(query, num_articles):
+@cache_news
+async def get_news_from_google(session, query, num_articles):
     """Get news from Google News"""
     logger.info("Fetching news from Google News")
 
     url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
 
     try:
-        feed = feedparser.parse(url)
+        feed = await fetch_feed(session, url)
         articles = []
 
         for entry in feed.entries[:num_articles]:
@@ -251,8 +422,8 @@ def get_news_from_google(query, num_articles):
                 "source": source,
                 "url": entry.link,
                 "publishedAt": entry.get("published", ""),
-                "content": entry.get("summary", ""),
-                "summary": entry.get("summary", "")
+                "content": clip_content(entry.get("summary", "")),
+                "summary": Markup(entry.get("summary", ""))
             })
 
         logger.info(f"Found {len(articles)} articles from Google News")
@@ -262,14 +433,15 @@ def get_news_from_google(query, num_articles):
         logger.error(f"Error with Google News: {e}")
         return []
 
-def get_news_from_bing(query, num_articles):
+@cache_news
+async def get_news_from_bing(session, query, num_articles):
     """Get news from Bing News (fallback method)"""
     logger.info("Fetching news from Bing News")
 
     url = f'https://www.bing.com/news/search?q={query}&format=rss'
 
     try:
-        feed = feedparser.parse(url)
+        feed = await fetch_feed(session, url)
         articles = []
 
         for entry in feed.entries[:num_articles]:
@@ -278,8 +450,8 @@ def get_news_from_bing(query, num_articles):
                 "source": "Bing News",
                 "url": entry.get("link", ""),
                 "publishedAt": entry.get("published", ""),
-                "content": entry.get("summary", ""),
-                "summary": entry.get("summary", "")
+                "content": clip_content(entry.get("summary", "")),
+                "summary": Markup(entry.get("summary", ""))
             })
 
         logger.info(f"Found {len(articles)} articles from Bing News")
@@ -289,40 +461,115 @@ def get_news_from_bing(query, num_articles):
         logger.error(f"Error with Bing News: {e}")
         return []
 
-def summarize(text):
+async def asummarize(session, text):
     """Generate a summary of the article text"""
-    HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
-
     if not HUGGINGFACE_API_KEY:
         logger.warning("No HUGGINGFACE_API_KEY found, using fallback summarizer")
         return fallback_summarize(text)
 
     # If text is too short, don't bother summarizing
-    if len(text) < 300:
+    if len(text.split()) < MIN_SUMMARY_WORDS:
         return text
 
+    key = summary_cache_key(text)
+    cached = get_cached_summary(key)
+    if cached is not None:
+        return cached
+
     try:
         logger.debug("Calling Hugging Face API for summarization")
-        API_URL = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-        headers = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
-
         payload = {
-            "inputs": text[:1024],  # Keep text within token limits
-            "parameters": {"max_length": 150, "min_length": 50, "do_sample": False},
+            "inputs": text[:MAX_SUMMARY_INPUT],  # Keep text within token limits
+            "parameters": SUMMARY_PARAMETERS,
         }
 
-        response = requests.post(API_URL, headers=headers, json=payload)
-
-        if response.status_code == 200:
-            summary = response.json()[0]["summary_text"]
-            return summary
-        else:
-            logger.error(f"Summarization API error: {response.status_code}, {response.text}")
-            return fallback_summarize(text)
+        async with session.post(HF_API_URL, headers=HF_HEADERS, json=payload) as response:
+            if response.status == 200:
+                summary = orjson.loads(await response.read())[0]["summary_text"]
+                cache_summary(key, summary)
+                return summary
+            else:
+                logger.error(f"Summarization API error: {response.status}, {await response.text()}")
+                return fallback_summarize(text)
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
         return fallback_summarize(text)
 
+async def summarize_batch(session, texts):
+    """Summarize several article texts with a single Hugging Face request"""
+    if not HUGGINGFACE_API_KEY:
+        logger.warning("No HUGGINGFACE_API_KEY found, using fallback summarizer")
+        return [fallback_summarize(text) for text in texts]
+
+    # Short texts are kept as they are, only the rest go to the model
+    summaries = list(texts)
+    pending = []
+    keys = {}
+    for i, text in enumerate(texts):
+        if len(text.split()) < MIN_SUMMARY_WORDS:
+            continue
+        keys[i] = summary_cache_key(text)
+        cached = get_cached_summary(keys[i])
+        if cached is not None:
+            summaries[i] = cached
+        else:
+            pending.append(i)
+
+    if not pending:
+        return summaries
+
+    try:
+        logger.debug(f"Calling Hugging Face API to summarize {len(pending)} articles")
+        payload = {
+            "inputs": [texts[i][:MAX_SUMMARY_INPUT] for i in pending],  # Keep texts within token limits
+            "parameters": SUMMARY_PARAMETERS,
+        }
+
+        async with session.post(HF_API_URL, headers=HF_HEADERS, json=payload) as response:
+            if response.status == 200:
+                results = orjson.loads(await response.read())
+                if len(results) == len(pending):
+                    for i, result in zip(pending, results):
+                        summaries[i] = result["summary_text"]
+                        cache_summary(keys[i], summaries[i])
+                    return summaries
+                logger.error(f"Batch summarization returned {len(results)} results for {len(pending)} inputs")
+            else:
+                logger.error(f"Batch summarization API error: {response.status}, {await response.text()}")
+    except Exception as e:
+        logger.error(f"Error generating batch summary: {e}")
+
+    # Fall back to summarizing each article on its own
+    logger.info("Falling back to per-article summarization")
+    semaphore = asyncio.Semaphore(SUMMARIZE_CONCURRENCY)
+
+    async def summarize_one(text):
+        async with semaphore:
+            return await asummarize(session, text)
+
+    results = await asyncio.gather(*[summarize_one(texts[i]) for i in pending])
+    for i, summary in zip(pending, results):
+        summaries[i] = summary
+    return summaries
+
+def summary_cache_key(text):
+    """Hash the part of the text that is sent to the model"""
+    return hashlib.sha256(text[:MAX_SUMMARY_INPUT].encode()).hexdigest()
+
+def get_cached_summary(key):
+    """Look up a cached summary, marking it as recently used"""
+    summary = summary_cache.get(key)
+    if summary is not None:
+        summary_cache.move_to_end(key)
+    return summary
+
+def cache_summary(key, summary):
+    """Store a model summary, evicting the oldest entry when full"""
+    summary_cache[key] = summary
+    summary_cache.move_to_end(key)
+    if len(summary_cache) > SUMMARY_CACHE_SIZE:
+        summary_cache.popitem(last=False)
+
 def fallback_summarize(text):
     """Simple fallback summarizer that extracts key sentences"""
     logger.debug("Using fallback summarizer")
@@ -332,7 +579,7 @@ def fallback_summarize(text):
         return text
 
     # Split text into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = _SENT_RE.split(text)
     sentences = [s.strip() for s in sentences if s.strip()]
 
     if len(sentences) <= 3:
@@ -342,21 +589,95 @@ def fallback_summarize(text):
     summary = ' '.join(sentences[:2]) + ' ' + sentences[-1]
     return summary
 
-def send_email_digest(email, articles):
-    """Send email digest with improved formatting and links"""
-    logger.info(f"Preparing email for {email} with {len(articles)} articles")
+# Email templates, compiled once at import. Summaries are escaped unless a source
+# marks them as Markup, which only the feedparser-sanitized feed summaries are
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+template_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+HTML_TEMPLATE = template_env.get_template("digest.html")
+TEXT_TEMPLATE = template_env.get_template("digest.txt")
 
-    ORIGIN_EMAIL = os.getenv("ORIGIN_EMAIL")
-    EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+def format_date(published):
+    """Format a published date for display, falling back to the raw value"""
+    try:
+        date = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        return date.strftime('%B %d, %Y')
+    except ValueError:
+        return published
+
+class SMTPPool:
+    """Keep one authenticated SMTP connection open and reuse it across sends"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.lock = asyncio.Lock()
+
+    async def _connect(self, user, password):
+        server = aiosmtplib.SMTP(hostname=self.host, port=self.port, use_tls=True)
+        await server.connect()
+        try:
+            await server.login(user, password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _discard(self):
+        # Drop the current connection without waiting on the server
+        if self.server is not None:
+            try:
+                self.server.close()
+            except (aiosmtplib.SMTPException, OSError):
+                pass
+            self.server = None
 
-    # Validate environment variables
-    if not ORIGIN_EMAIL:
-        logger.error("ORIGIN_EMAIL environment variable is not set")
-        raise ValueError("Email sender address not configured in environment variables")
+    async def _is_alive(self):
+        # Heartbeat the idle connection before reusing it
+        try:
+            return (await self.server.noop()).code == 250
+        except (aiosmtplib.SMTPException, OSError):
+            return False
 
-    if not EMAIL_PASSWORD:
-        logger.error("EMAIL_PASSWORD environment variable is not set")
-        raise ValueError("Email password not configured in environment variables")
+    async def send(self, user, password, recipient, message):
+        """Send a message, connecting or reconnecting as needed"""
+        async with self.lock:
+            if self.server is None or not await self._is_alive():
+                self._discard()
+                self.server = await self._connect(user, password)
+
+            try:
+                await self.server.sendmail(user, [recipient], message)
+            except aiosmtplib.SMTPServerDisconnected:
+                logger.info("SMTP connection dropped, reconnecting")
+                self._discard()
+                self.server = await self._connect(user, password)
+                await self.server.sendmail(user, [recipient], message)
+
+    async def close(self):
+        """Close the connection if one is open"""
+        async with self.lock:
+            if self.server is not None:
+                try:
+                    await self.server.quit()
+                except (aiosmtplib.SMTPException, OSError):
+                    pass
+                self.server = None
+
+smtp_pool = SMTPPool("smtp.gmail.com", 465)
+
+@app.on_event("shutdown")
+async def close_smtp_pool():
+    await smtp_pool.close()
+
+async def send_email_digest(email, articles):
+    """Send email digest with improved formatting and links"""
+    logger.info(f"Preparing email for {email} with {len(articles)} articles")
 
     # Create HTML email
     msg = MIMEMultipart('alternative')
@@ -364,79 +685,9 @@ def send_email_digest(email, articles):
     msg['From'] = ORIGIN_EMAIL
     msg['To'] = email
 
-    # Create plain text version
-    text_content = "Your News Digest\n\n"
-
-    for i, article in enumerate(articles, 1):
-        text_content += f"ARTICLE {i}: {article['title']}\n"
-        text_content += f"Source: {article.get('source', 'Unknown')}\n"
-
-        if article.get('url'):
-            text_content += f"Link: {article['url']}\n"
-
-        if article.get('publishedAt'):
-            # Try to format date if possible
-            try:
-                date = datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00'))
-                text_content += f"Published: {date.strftime('%B %d, %Y')}\n"
-            except:
-                text_content += f"Published: {article['publishedAt']}\n"
-
-        text_content += "\n"
-
-        if article.get('summary'):
-            text_content += f"Summary: {article['summary']}\n"
-
-        text_content += "\n" + "-"*40 + "\n\n"
-
-    text_content += "\nPowered by DigestAI"
-
-    # Create HTML version
-    html_content = """
-    <html>
-    <head>
-        <style>
-            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; }
-            h1 { color: #2c3e50; border-bottom: 1px solid #eee; padding-bottom: 10px; }
-            h2 { color: #2980b9; }
-            .article { margin-bottom: 30px; border-bottom: 1px solid #eee; padding-bottom: 20px; }
-            .source { color: #7f8c8d; font-style: italic; margin-bottom: 10px; }
-            .date { color: #7f8c8d; margin-bottom: 15px; }
-            .summary { line-height: 1.8; }
-            .read-more { display: inline-block; margin-top: 10px; color: #3498db; text-decoration: none; font-weight: bold; }
-            .footer { margin-top: 30px; color: #7f8c8d; font-size: 0.9em; }
-        </style>
-    </head>
-    <body>
-        <h1>Your News Digest</h1>
-    """
-
-    for article in articles:
-        html_content += f"<div class='article'>"
-        html_content += f"<h2>{article['title']}</h2>"
-        html_content += f"<div class='source'>Source: {article.get('source', 'Unknown')}</div>"
-
-        if article.get('publishedAt'):
-            # Try to format date if possible
-            try:
-                date = datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00'))
-                html_content += f"<div class='date'>Published: {date.strftime('%B %d, %Y')}</div>"
-            except:
-                html_content += f"<div class='date'>Published: {article['publishedAt']}</div>"
-
-        if article.get('summary'):
-            html_content += f"<div class='summary'>{article['summary']}</div>"
-
-        if article.get('url'):
-            html_content += f"<a href='{article['url']}' class='read-more'>Read Full Article</a>"
-
-        html_content += "</div>"
-
-    html_content += """
-        <div class='footer'>Powered by DigestAI</div>
-    </body>
-    </html>
-    """
+    # Render plain text and HTML versions
+    text_content = TEXT_TEMPLATE.render(articles=articles, format_date=format_date)
+    html_content = HTML_TEMPLATE.render(articles=articles, format_date=format_date)
 
     # Attach both text and HTML versions
     part1 = MIMEText(text_content, 'plain')
@@ -446,10 +697,7 @@ def send_email_digest(email, articles):
 
     # Send email
     try:
-        server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
-        server.login(ORIGIN_EMAIL, EMAIL_PASSWORD)
-        server.sendmail(ORIGIN_EMAIL, email, msg.as_string())
-        server.quit()
+        await smtp_pool.send(ORIGIN_EMAIL, EMAIL_PASSWORD, email, msg.as_string())
         logger.info(f"✅ Email successfully sent to {email}")
     except Exception as e:
         logger.error(f"❌ Error sending email: {e}")
@@ -460,4 +708,6 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 5001))
     logger.info(f"Starting FastAPI server on port {port}")
+    # uvicorn picks uvloop and httptools when installed (pip install "uvicorn[standard]"),
+    # and falls back to asyncio and h11 otherwise
     uvicorn.run(app, host="0.0.0.0", port=port)